@@ -3,6 +3,7 @@
 from typing import Literal
 
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
 
 from shared.logging import get_logger
 from .utils.state import AgentState, ResearcherState, IndexState
@@ -24,8 +25,13 @@ logger = get_logger(__name__)
 
 def route_query(
     state: AgentState,
-) -> Literal["research_planner", "retrieve_docs", "generate_response"]:
-    """Route based on query analysis."""
+) -> Literal["retrieve_docs", "generate_response"] | list[Send]:
+    """Route based on query analysis.
+
+    Retrieval only depends on the user question, so for "more-info" queries the
+    planner and the retriever are dispatched in parallel and both feed into
+    ``generate_response``.
+    """
     analysis = state.query_analysis or "general"
 
     logger.info("Routing query", analysis=analysis)
@@ -33,7 +39,7 @@ def route_query(
     if analysis == "langchain":
         return "retrieve_docs"
     elif analysis == "more-info":
-        return "research_planner"
+        return [Send("research_planner", state), Send("retrieve_docs", state)]
     else:
         return "generate_response"
 
@@ -97,17 +103,12 @@ def build_retrieval_graph():
     builder.add_conditional_edges(
         "query_analysis",
         route_query,
-        {
-            "research_planner": "research_planner",
-            "retrieve_docs": "retrieve_docs",
-            "generate_response": "generate_response",
-        },
+        ["research_planner", "retrieve_docs", "generate_response"],
     )
 
-    # Research planning flow
-    builder.add_edge("research_planner", "retrieve_docs")
-
-    # All paths lead to response generation
+    # All paths lead to response generation; when planning and retrieval run
+    # in parallel they finish in the same superstep, so this runs once
+    builder.add_edge("research_planner", "generate_response")
     builder.add_edge("retrieve_docs", "generate_response")
     builder.add_edge("generate_response", END)
 
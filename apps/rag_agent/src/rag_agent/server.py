@@ -1,17 +1,22 @@
 """FastAPI server for the RAG agent."""
 
+import json
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
+from anyio import to_thread
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from langchain_core.messages import AIMessageChunk
 from langgraph.server import add_routes
+from shared.http import aclose_http_client, get_http_client
 from shared.logging import setup_logging, get_logger
-from shared.settings import RagAgentSettings
+from shared.settings import get_rag_settings
 
 from .graph import indexer_graph, retrieval_graph
 
 
-settings = RagAgentSettings()
+settings = get_rag_settings()
 logger = get_logger(__name__)
 
 
@@ -19,9 +24,14 @@ logger = get_logger(__name__)
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan manager."""
     setup_logging(settings.log_level)
+    # Widen the threadpool used for sync endpoints so blocking calls cannot starve it
+    to_thread.current_default_thread_limiter().total_tokens = 100
+    # Create the shared HTTP client before the first request needs it
+    get_http_client()
     logger.info("Starting RAG Agent server", port=settings.rag_agent_port)
     yield
     logger.info("Shutting down RAG Agent server")
+    await aclose_http_client()
 
 
 app = FastAPI(
@@ -42,6 +52,26 @@ async def health() -> dict[str, bool]:
     return {"ok": True}
 
 
+@app.post("/stream/tokens")
+async def stream_tokens(payload: dict[str, Any]) -> StreamingResponse:
+    """Stream the generated answer token by token as server-sent events."""
+
+    async def event_stream() -> AsyncGenerator[str, None]:
+        async for chunk, metadata in retrieval_graph.astream(
+            payload.get("input", {}), stream_mode="messages"
+        ):
+            # Skip the final message the node returns; its tokens were already sent
+            if (
+                isinstance(chunk, AIMessageChunk)
+                and metadata.get("langgraph_node") == "generate_response"
+                and chunk.content
+            ):
+                yield f"data: {json.dumps({'content': chunk.content})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.get("/")
 async def root() -> dict[str, str]:
     """Root endpoint with API information."""
@@ -50,6 +80,7 @@ async def root() -> dict[str, str]:
         "endpoints": {
             "indexer": "/indexer - Document indexing graph",
             "retrieval": "/ - Main retrieval and response graph",
+            "stream": "/stream/tokens - Stream the generated answer as server-sent events",
             "health": "/healthz - Health check",
         },
     }
@@ -62,5 +93,7 @@ if __name__ == "__main__":
         "rag_agent.server:app",
         host=settings.rag_agent_host,
         port=settings.rag_agent_port,
-        reload=True,
+        loop="uvloop",
+        http="httptools",
+        reload=settings.environment == "development",
     )
@@ -1,19 +1,26 @@
 """Node implementations for the RAG agent graphs."""
 
-from typing import Dict, Any
+import asyncio
+import re
+from typing import Dict, Any, List
 
+from langchain_core.documents import Document
 from langchain_core.messages import AIMessage, HumanMessage
-from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
+from langchain_core.vectorstores import VectorStore
 from langchain.chat_models import init_chat_model
 
+from shared.http import http_client_cache, on_http_client_close, provider_http_kwargs
 from shared.logging import get_logger
-from .state import AgentState, ResearcherState, IndexState
+from .state import AgentState, ResearcherState, IndexState, RoutingDecision, document_key
 from .tools import (
     load_embeddings,
     load_vector_store,
     load_sample_documents,
     split_documents,
+    batch_embed_and_add,
+    persist_vector_store,
     retrieve_documents,
     format_docs_xml,
 )
@@ -26,11 +33,80 @@ from .prompts import (
 
 logger = get_logger(__name__)
 
+# Upper bound on concurrent vector store lookups issued by a single research step
+MAX_PARALLEL_RETRIEVALS = 4
 
+# Vector store shared by all nodes, created lazily on first use
+_default_store: VectorStore | None = None
+_default_store_lock = asyncio.Lock()
+
+# Structured-output routing models, keyed by the id of the (cached) chat model they wrap
+_ROUTING_MODELS: Dict[int, Runnable[Any, RoutingDecision]] = {}
+
+# Prompt templates are stateless, so parse them once at import time
+_QUERY_ANALYSIS_PROMPT = ChatPromptTemplate.from_template(QUERY_ANALYSIS_PROMPT)
+_RESEARCH_PLANNER_PROMPT = ChatPromptTemplate.from_template(RESEARCH_PLANNER_PROMPT)
+_RESPONSE_GENERATOR_PROMPT = ChatPromptTemplate.from_template(RESPONSE_GENERATOR_PROMPT)
+_RESEARCHER_QUERY_PROMPT = ChatPromptTemplate.from_template(RESEARCHER_QUERY_PROMPT)
+
+# Matches "1. query", "- query" or "* query" lines and captures the query text
+_QUERY_LINE_RE = re.compile(r"^\s*(?:\d+\.\s*|[-*]\s+)(.+?)\s*$")
+
+
+@http_client_cache(maxsize=8)
 def load_chat_model_from_env(model: str = "anthropic/claude-3-5-sonnet-20240620"):
-    """Load chat model from environment configuration."""
+    """Load chat model from environment configuration.
+
+    Models are cached per name so every node shares one client and its connection pool.
+    """
     provider, model_name = model.split("/", maxsplit=1)
-    return init_chat_model(model_name, model_provider=provider)
+
+    return init_chat_model(model_name, model_provider=provider, **provider_http_kwargs(provider))
+
+
+@on_http_client_close
+def _drop_http_bound_models() -> None:
+    """Forget routing models and the shared store, which wrap cached clients."""
+    global _default_store
+
+    _ROUTING_MODELS.clear()
+    _default_store = None
+
+
+def load_routing_model() -> Runnable[Any, RoutingDecision]:
+    """Load the chat model bound to return a validated ``RoutingDecision``."""
+    model = load_chat_model_from_env()
+
+    key = id(model)
+    if key not in _ROUTING_MODELS:
+        _ROUTING_MODELS[key] = model.with_structured_output(RoutingDecision)
+
+    return _ROUTING_MODELS[key]
+
+
+def _last_user_question(state: AgentState) -> str:
+    """Return the content of the latest message if it comes from the user, else ""."""
+    if state.messages and isinstance(state.messages[-1], HumanMessage):
+        return state.messages[-1].content
+    return ""
+
+
+async def get_default_store() -> VectorStore:
+    """Return the shared vector store, initializing it once per process.
+
+    Initialization may embed a seed document, so it runs off the event loop and
+    behind a lock to keep concurrent first requests from building it twice.
+    """
+    global _default_store
+
+    if _default_store is None:
+        async with _default_store_lock:
+            if _default_store is None:
+                embeddings = load_embeddings()
+                # Default to FAISS for simplicity
+                _default_store = await asyncio.to_thread(load_vector_store, "faiss", embeddings)
+
+    return _default_store
 
 
 # Index Graph Nodes
@@ -54,12 +130,11 @@ async def index_docs(state: IndexState) -> Dict[str, Any]:
         # Split documents into chunks
         chunks = split_documents(documents)
 
-        # Load embeddings and vector store
-        embeddings = load_embeddings()
-        vector_store = load_vector_store("faiss", embeddings)  # Default to FAISS for simplicity
+        vector_store = await get_default_store()
 
         # Add documents to vector store
-        await vector_store.aadd_documents(chunks)
+        await batch_embed_and_add(vector_store, chunks)
+        await persist_vector_store(vector_store)
 
         logger.info("Document indexing completed", count=len(chunks))
         return {"indexed_count": len(chunks)}
@@ -77,24 +152,17 @@ async def query_analysis(state: AgentState) -> Dict[str, Any]:
     """Analyze the user query and determine routing."""
     logger.info("Analyzing query for routing")
 
-    if not state.messages:
-        return {"query_analysis": "general"}
-
-    last_message = state.messages[-1]
-    if not isinstance(last_message, HumanMessage):
+    question = _last_user_question(state)
+    if not question:
         return {"query_analysis": "general"}
 
-    question = last_message.content
-
     try:
-        model = load_chat_model_from_env()
-        prompt = ChatPromptTemplate.from_template(QUERY_ANALYSIS_PROMPT)
-        parser = JsonOutputParser()
-        chain = prompt | model | parser
+        # The provider's structured-output mode guarantees a valid routing decision
+        chain = _QUERY_ANALYSIS_PROMPT | load_routing_model()
 
-        result = await chain.ainvoke({"question": question})
+        decision = await chain.ainvoke({"question": question})
 
-        datasource = result.get("datasource", "general")
+        datasource = decision.datasource
         logger.info("Query analysis completed", datasource=datasource)
 
         return {"query_analysis": datasource}
@@ -111,13 +179,11 @@ async def research_planner(state: AgentState) -> Dict[str, Any]:
     if not state.messages:
         return {"research_plan": "No query provided", "steps": []}
 
-    last_message = state.messages[-1]
-    question = last_message.content if isinstance(last_message, HumanMessage) else ""
+    question = _last_user_question(state)
 
     try:
         model = load_chat_model_from_env()
-        prompt = ChatPromptTemplate.from_template(RESEARCH_PLANNER_PROMPT)
-        chain = prompt | model
+        chain = _RESEARCH_PLANNER_PROMPT | model
 
         result = await chain.ainvoke({"question": question})
         plan = result.content
@@ -143,13 +209,10 @@ async def retrieve_docs(state: AgentState) -> Dict[str, Any]:
     if not state.messages:
         return {"documents": []}
 
-    last_message = state.messages[-1]
-    query = last_message.content if isinstance(last_message, HumanMessage) else ""
+    query = _last_user_question(state)
 
     try:
-        # Load vector store
-        embeddings = load_embeddings()
-        vector_store = load_vector_store("faiss", embeddings)
+        vector_store = await get_default_store()
 
         # Retrieve documents
         docs = await retrieve_documents(vector_store, query, k=10)
@@ -169,23 +232,26 @@ async def generate_response(state: AgentState) -> Dict[str, Any]:
     if not state.messages:
         return {"messages": [AIMessage(content="No query provided.")]}
 
-    last_message = state.messages[-1]
-    question = last_message.content if isinstance(last_message, HumanMessage) else ""
+    question = _last_user_question(state)
 
     # Format documents as context
     context = format_docs_xml(state.documents)
 
     try:
         model = load_chat_model_from_env()
-        prompt = ChatPromptTemplate.from_template(RESPONSE_GENERATOR_PROMPT)
-        chain = prompt | model
+        chain = _RESPONSE_GENERATOR_PROMPT | model
 
-        result = await chain.ainvoke({"question": question, "context": context})
+        # Stream the answer so graph.astream(stream_mode="messages") can forward
+        # tokens to clients as they are produced
+        result = None
+        async for chunk in chain.astream({"question": question, "context": context}):
+            result = chunk if result is None else result + chunk
 
-        response = AIMessage(content=result.content)
+        answer = result.content if result is not None else ""
+        response = AIMessage(content=answer)
         logger.info("Response generated")
 
-        return {"messages": [response], "answer": result.content}
+        return {"messages": [response], "answer": answer}
 
     except Exception as e:
         error_msg = f"Response generation failed: {str(e)}"
@@ -196,6 +262,14 @@ async def generate_response(state: AgentState) -> Dict[str, Any]:
 # Researcher Subgraph Nodes
 
 
+async def _bounded_retrieve(
+    semaphore: asyncio.Semaphore, vector_store: VectorStore, query: str
+) -> List[Document]:
+    """Retrieve documents for a query while holding a slot of the semaphore."""
+    async with semaphore:
+        return await retrieve_documents(vector_store, query, k=5)
+
+
 async def generate_queries(state: ResearcherState) -> Dict[str, Any]:
     """Generate search queries for research."""
     logger.info("Generating research queries")
@@ -205,24 +279,16 @@ async def generate_queries(state: ResearcherState) -> Dict[str, Any]:
 
     try:
         model = load_chat_model_from_env()
-        prompt = ChatPromptTemplate.from_template(RESEARCHER_QUERY_PROMPT)
-        chain = prompt | model
+        chain = _RESEARCHER_QUERY_PROMPT | model
 
         result = await chain.ainvoke({"question": state.research_question})
 
-        # Extract queries from result (simplified)
-        queries = [
-            q.strip()
-            for q in result.content.split("\n")
-            if q.strip() and q.strip().startswith(("1.", "2.", "3.", "-", "*"))
-        ]
-
-        # Clean up queries
+        # Extract numbered or bulleted queries, keeping the top 3 meaningful ones
         queries = [
-            q.split(".", 1)[-1].strip() if q[0].isdigit() else q.lstrip("-* ").strip()
-            for q in queries
-        ]
-        queries = [q for q in queries if len(q) > 10][:3]  # Keep top 3 meaningful queries
+            m.group(1)
+            for line in result.content.splitlines()
+            if (m := _QUERY_LINE_RE.match(line)) and len(m.group(1)) > 10
+        ][:3]
 
         logger.info("Research queries generated", count=len(queries))
         return {"queries": queries}
@@ -240,14 +306,26 @@ async def research_step(state: ResearcherState) -> Dict[str, Any]:
         return {"documents": []}
 
     try:
-        # Load vector store
-        embeddings = load_embeddings()
-        vector_store = load_vector_store("faiss", embeddings)
-
-        all_docs = []
-        for query in state.queries:
-            docs = await retrieve_documents(vector_store, query, k=5)
-            all_docs.extend(docs)
+        vector_store = await get_default_store()
+
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_RETRIEVALS)
+        results = await asyncio.gather(
+            *(_bounded_retrieve(semaphore, vector_store, query) for query in state.queries),
+            return_exceptions=True,
+        )
+
+        # Similar queries return overlapping hits, so drop duplicates before the reducer
+        all_docs: List[Document] = []
+        seen = set()
+        for query, result in zip(state.queries, results):
+            if isinstance(result, BaseException):
+                logger.error("Research query failed", query=query, error=str(result))
+                continue
+            for doc in result:
+                key = document_key(doc)
+                if key not in seen:
+                    seen.add(key)
+                    all_docs.append(doc)
 
         logger.info("Research step completed", docs_count=len(all_docs))
         return {"documents": all_docs}
@@ -2,40 +2,65 @@
 
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass, field
-from typing import List, Sequence
+from itertools import chain
+from typing import Dict, List, Literal, Sequence, Tuple
 
 from langchain_core.documents import Document
 from langchain_core.messages import AnyMessage
 from langgraph.graph import add_messages
+from pydantic import BaseModel, Field
 from typing_extensions import Annotated
 
+# Metadata field caching a short digest of a document's content for deduplication
+DEDUPE_KEY_FIELD = "_dedupe_key"
+
+
+def content_digest(content: str) -> str:
+    """Return a short, fixed-size digest of document content."""
+    return hashlib.blake2b(content.encode(), digest_size=8).hexdigest()
+
+
+def document_key(doc: Document) -> Tuple[str, str]:
+    """Return the deduplication key of a document: its source and a digest of its content.
+
+    The digest is read from the document metadata when it was precomputed at
+    retrieval time, so long contents are not rehashed on every merge.
+    """
+    digest = doc.metadata.get(DEDUPE_KEY_FIELD)
+    if digest is None:
+        digest = content_digest(doc.page_content)
+    return (doc.metadata.get("source", ""), digest)
+
 
 def add_documents(left: List[Document] | None, right: List[Document] | None) -> List[Document]:
     """Add documents with deduplication based on content."""
-    if not left:
-        left = []
-    if not right:
-        right = []
-
-    # Use dict to deduplicate by source and content
-    seen = {}
-    for doc in left + right:
-        key = (doc.metadata.get("source", ""), doc.page_content)
-        if key not in seen:
-            seen[key] = doc
+    # Use dict to deduplicate by source and content digest, keeping the first occurrence
+    seen: Dict[Tuple[str, str], Document] = {}
+    for doc in chain(left or (), right or ()):
+        seen.setdefault(document_key(doc), doc)
 
     return list(seen.values())
 
 
-@dataclass
+class RoutingDecision(BaseModel):
+    """Structured output of the query analysis step."""
+
+    datasource: Literal["langchain", "more-info", "general"] = Field(
+        description="Where to route the question: the vectorstore ('langchain'), "
+        "research planning ('more-info'), or a direct answer ('general')."
+    )
+
+
+@dataclass(slots=True)
 class InputState:
     """Input state for the RAG agent."""
 
     messages: Annotated[Sequence[AnyMessage], add_messages] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentState(InputState):
     """Complete state for the RAG retrieval graph."""
 
@@ -58,7 +83,7 @@ class AgentState(InputState):
     session_id: str | None = field(default=None)
 
 
-@dataclass
+@dataclass(slots=True)
 class ResearcherState:
     """State for the researcher subgraph."""
 
@@ -73,7 +98,7 @@ class ResearcherState:
     step_number: int = field(default=0)
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexState:
     """State for document indexing."""
 
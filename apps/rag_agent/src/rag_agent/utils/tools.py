@@ -1,9 +1,13 @@
 """Tools for document loading, processing, and retrieval."""
 
+import asyncio
 import os
-import json
-from typing import List, Any
+import weakref
+from contextlib import asynccontextmanager, nullcontext
+from typing import AsyncContextManager, AsyncIterator, Dict, Iterator, List, Tuple, Any
+from xml.sax.saxutils import escape
 
+import orjson
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
 from langchain_core.vectorstores import VectorStore
@@ -11,23 +15,124 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_cohere import CohereEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from shared.cache import TTLCache
+from shared.http import http_client_cache, on_http_client_close, provider_http_kwargs
 from shared.logging import get_logger
+from .state import DEDUPE_KEY_FIELD, content_digest
 
 logger = get_logger(__name__)
 
-
+# Directory the local FAISS index is persisted to when FAISS_INDEX_PATH is unset
+DEFAULT_FAISS_INDEX_PATH = ".faiss_index"
+
+# HNSW graph parameters for new FAISS indexes: neighbours per node, and the candidate
+# list sizes used while building the graph and while searching it
+FAISS_HNSW_M = 32
+FAISS_HNSW_EF_CONSTRUCTION = 200
+FAISS_HNSW_EF_SEARCH = 64
+
+# In-memory FAISS stores, keyed by the id of the (cached) embeddings they were built
+# with and the directory the index is persisted to
+_FAISS_STORES: Dict[Tuple[int, str], VectorStore] = {}
+
+# Recent retrieval results, keyed by (vector store id, query, k)
+RETRIEVAL_CACHE_SIZE = 1024
+RETRIEVAL_CACHE_TTL = 300.0
+_RETRIEVAL_CACHE: TTLCache[Tuple[int, str, int], List[Document]] = TTLCache(
+    RETRIEVAL_CACHE_SIZE, RETRIEVAL_CACHE_TTL
+)
+
+
+class _ReadWriteLock:
+    """Asyncio lock that admits many readers or a single writer.
+
+    Waiting writers block new readers, so a steady stream of searches cannot starve
+    indexing.
+    """
+
+    def __init__(self) -> None:
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writers_waiting = 0
+        self._writing = False
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[None]:
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writing and not self._writers_waiting)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[None]:
+        async with self._condition:
+            self._writers_waiting += 1
+            try:
+                await self._condition.wait_for(lambda: not self._writing and not self._readers)
+            finally:
+                self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+# Per-store locks for in-process FAISS indexes. FAISS searches run on executor threads
+# while adds and saves touch the same index, which faiss does not support concurrently.
+# Hosted stores handle concurrent reads and writes themselves and are never locked.
+_STORE_LOCKS: "weakref.WeakKeyDictionary[VectorStore, _ReadWriteLock]" = weakref.WeakKeyDictionary()
+
+
+def get_store_lock(vector_store: VectorStore) -> _ReadWriteLock:
+    """Return the lock that orders searches against writes to ``vector_store``."""
+    lock = _STORE_LOCKS.get(vector_store)
+    if lock is None:
+        lock = _STORE_LOCKS[vector_store] = _ReadWriteLock()
+    return lock
+
+
+def _local_index_guard(vector_store: VectorStore, *, write: bool) -> AsyncContextManager[None]:
+    """Lock a FAISS store for reading or writing; other stores are left unlocked."""
+    from langchain_community.vectorstores import FAISS
+
+    if not isinstance(vector_store, FAISS):
+        return nullcontext()
+
+    lock = get_store_lock(vector_store)
+    return lock.write() if write else lock.read()
+
+
+@http_client_cache(maxsize=4)
 def load_embeddings(provider: str = "openai", model: str = "text-embedding-3-small") -> Embeddings:
-    """Load embedding model from specified provider."""
+    """Load embedding model from specified provider.
+
+    Clients are cached per ``(provider, model)`` so they are built once per process.
+    """
     logger.info("Loading embeddings", provider=provider, model=model)
 
     if provider == "openai":
-        return OpenAIEmbeddings(model=model)
+        return OpenAIEmbeddings(model=model, **provider_http_kwargs(provider))
     elif provider == "cohere":
         return CohereEmbeddings(model=model)
     else:
         raise ValueError(f"Unsupported embedding provider: {provider}")
 
 
+@on_http_client_close
+def _drop_http_bound_stores() -> None:
+    """Forget FAISS stores and results built on the embeddings cleared with the client."""
+    _FAISS_STORES.clear()
+    clear_retrieval_cache()
+
+
 def load_vector_store(store_type: str, embeddings: Embeddings, **kwargs: Any) -> VectorStore:
     """Load vector store of specified type."""
     logger.info("Loading vector store", type=store_type)
@@ -78,25 +183,90 @@ def load_vector_store(store_type: str, embeddings: Embeddings, **kwargs: Any) ->
         )
 
     elif store_type == "faiss":
-        from langchain_community.vectorstores import FAISS
+        index_path = _faiss_index_path(kwargs)
 
-        # Create empty FAISS index
-        return FAISS.from_texts(
-            texts=["Initial document"],  # Need at least one text to initialize
-            embedding=embeddings,
-        )
+        return _get_faiss(embeddings, index_path)
 
     else:
         raise ValueError(f"Unsupported vector store type: {store_type}")
 
 
+def _faiss_index_path(kwargs: Dict[str, Any]) -> str:
+    """Resolve the FAISS index directory from kwargs, then env, then the default."""
+    return str(kwargs.get("index_path", os.getenv("FAISS_INDEX_PATH", DEFAULT_FAISS_INDEX_PATH)))
+
+
+def _get_faiss(embeddings: Embeddings, index_path: str) -> VectorStore:
+    """Return the process-wide FAISS store for the given embeddings, building it once.
+
+    A previously persisted index at ``index_path`` is loaded from disk; otherwise a
+    fresh index is created.
+    """
+    key = (id(embeddings), index_path)
+    if key not in _FAISS_STORES:
+        from langchain_community.vectorstores import FAISS
+
+        if os.path.exists(index_path):
+            # The docstore is pickled, so only load indexes this service wrote itself
+            _FAISS_STORES[key] = FAISS.load_local(
+                index_path, embeddings, allow_dangerous_deserialization=True
+            )
+            logger.info("Loaded persisted FAISS index", path=index_path)
+        else:
+            _FAISS_STORES[key] = _new_faiss_hnsw(embeddings)
+    return _FAISS_STORES[key]
+
+
+def _new_faiss_hnsw(embeddings: Embeddings) -> VectorStore:
+    """Create an empty FAISS store backed by an HNSW graph index.
+
+    Unlike the default flat index, which scans every vector on each query, HNSW
+    search cost grows roughly logarithmically with the corpus size.
+    """
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+
+    # Embed a probe string once to learn the vector dimension
+    dimension = len(embeddings.embed_query("dimension probe"))
+
+    index = faiss.IndexHNSWFlat(dimension, FAISS_HNSW_M)
+    index.hnsw.efConstruction = FAISS_HNSW_EF_CONSTRUCTION
+    index.hnsw.efSearch = FAISS_HNSW_EF_SEARCH
+
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+    )
+
+
+async def persist_vector_store(vector_store: VectorStore, **kwargs: Any) -> None:
+    """Save a local FAISS store to disk so later processes can reload it.
+
+    The save runs in a worker thread while holding the store's write lock, so it
+    never overlaps a search or an add. Hosted vector stores persist on their own, so
+    this is a no-op for them.
+    """
+    from langchain_community.vectorstores import FAISS
+
+    if not isinstance(vector_store, FAISS):
+        return
+
+    index_path = _faiss_index_path(kwargs)
+    async with get_store_lock(vector_store).write():
+        await asyncio.to_thread(vector_store.save_local, index_path)
+    logger.info("Persisted FAISS index", path=index_path)
+
+
 async def load_sample_documents() -> List[Document]:
     """Load sample documents for indexing."""
     sample_docs_path = os.path.join(os.path.dirname(__file__), "../sample_docs.json")
 
     try:
-        with open(sample_docs_path, "r") as f:
-            data = json.load(f)
+        with open(sample_docs_path, "rb") as f:
+            data = orjson.loads(f.read())
 
         documents = []
         for item in data:
@@ -132,11 +302,81 @@ def split_documents(
     return chunks
 
 
+async def batch_embed_and_add(
+    vector_store: VectorStore,
+    chunks: List[Document],
+    batch_size: int = 128,
+    concurrency: int = 4,
+) -> List[str]:
+    """Add chunks to the vector store in batches, embedding several batches concurrently.
+
+    Each batch goes through a single ``aadd_texts`` call, which most integrations
+    turn into one embeddings request, so round-trips scale with the number of
+    batches rather than the number of chunks.
+
+    FAISS writes hold the store's write lock. Batches are embedded before the lock
+    is taken, so only the in-memory index update excludes concurrent searches.
+    """
+    from langchain_community.vectorstores import FAISS
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def add_batch(batch: List[Document]) -> List[str]:
+        texts = [doc.page_content for doc in batch]
+        metadatas = [doc.metadata for doc in batch]
+        async with semaphore:
+            if isinstance(vector_store, FAISS) and vector_store.embeddings is not None:
+                vectors = await vector_store.embeddings.aembed_documents(texts)
+                async with get_store_lock(vector_store).write():
+                    return vector_store.add_embeddings(zip(texts, vectors), metadatas=metadatas)
+
+            async with _local_index_guard(vector_store, write=True):
+                return await vector_store.aadd_texts(texts, metadatas=metadatas)
+
+    batches = [chunks[i : i + batch_size] for i in range(0, len(chunks), batch_size)]
+    results = await asyncio.gather(*(add_batch(batch) for batch in batches))
+
+    ids = [doc_id for batch_ids in results for doc_id in batch_ids]
+    logger.info("Added documents in batches", count=len(chunks), batches=len(batches))
+
+    # Newly indexed chunks may change the results of any cached query
+    clear_retrieval_cache()
+    return ids
+
+
+def clear_retrieval_cache() -> None:
+    """Drop all cached retrieval results."""
+    _RETRIEVAL_CACHE.clear()
+
+
 async def retrieve_documents(vector_store: VectorStore, query: str, k: int = 10) -> List[Document]:
-    """Retrieve relevant documents for a query."""
+    """Retrieve relevant documents for a query.
+
+    Results are cached for ``RETRIEVAL_CACHE_TTL`` seconds, so repeated queries skip
+    the embedding and similarity search round-trips.
+    """
+    key = (id(vector_store), query, k)
+    cached = _RETRIEVAL_CACHE.get(key)
+    if cached is not None:
+        logger.info("Retrieved documents from cache", query=query, count=len(cached))
+        return list(cached)
+
     try:
-        docs = await vector_store.asimilarity_search(query, k=k)
+        async with _local_index_guard(vector_store, write=False):
+            docs = await vector_store.asimilarity_search(query, k=k)
+        # Tag copies: stores like FAISS return the documents held in their docstore
+        docs = [
+            doc.model_copy(
+                update={
+                    "metadata": {DEDUPE_KEY_FIELD: content_digest(doc.page_content), **doc.metadata}
+                }
+            )
+            for doc in docs
+        ]
         logger.info("Retrieved documents", query=query, count=len(docs))
+
+        _RETRIEVAL_CACHE.put(key, list(docs))
+
         return docs
     except Exception as e:
         logger.error("Document retrieval failed", query=query, error=str(e))
@@ -148,17 +388,25 @@ def format_docs_xml(docs: List[Document]) -> str:
     if not docs:
         return "<documents>\nNo documents found.\n</documents>"
 
-    formatted = ["<documents>"]
+    return "\n".join(_iter_docs_xml_lines(docs))
+
+
+def _iter_docs_xml_lines(docs: List[Document]) -> Iterator[str]:
+    """Yield the lines of the XML representation of the documents."""
+    yield "<documents>"
 
     for i, doc in enumerate(docs):
-        formatted.extend(
-            [f'<document index="{i}">', f"<content>{doc.page_content}</content>", "<metadata>"]
-        )
+        yield f'<document index="{i}">'
+        yield f"<content>{escape(doc.page_content)}</content>"
+        yield "<metadata>"
 
         for key, value in doc.metadata.items():
-            formatted.append(f"<{key}>{value}</{key}>")
+            # The dedupe key is internal bookkeeping, not model context
+            if key == DEDUPE_KEY_FIELD:
+                continue
+            yield f"<{key}>{escape(str(value))}</{key}>"
 
-        formatted.extend(["</metadata>", "</document>"])
+        yield "</metadata>"
+        yield "</document>"
 
-    formatted.append("</documents>")
-    return "\n".join(formatted)
+    yield "</documents>"
@@ -1,10 +1,47 @@
 """Smoke tests for the RAG agent graphs."""
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 
-from rag_agent.graph import build_indexer_graph, build_retrieval_graph, build_researcher_graph
-from rag_agent.utils.state import AgentState, IndexState, ResearcherState
+from langchain_core.documents import Document
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import RunnableLambda
+
+from rag_agent.graph import (
+    build_indexer_graph,
+    build_retrieval_graph,
+    build_researcher_graph,
+    route_query,
+)
+from rag_agent.utils import nodes
+from rag_agent.utils.tools import (
+    _new_faiss_hnsw,
+    batch_embed_and_add,
+    clear_retrieval_cache,
+    format_docs_xml,
+    get_store_lock,
+    persist_vector_store,
+    retrieve_documents,
+)
+from rag_agent.utils.state import (
+    DEDUPE_KEY_FIELD,
+    AgentState,
+    IndexState,
+    ResearcherState,
+    RoutingDecision,
+    add_documents,
+    content_digest,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_default_store(monkeypatch):
+    """Drop the cached vector store and results so each test sees its own mocks."""
+    monkeypatch.setattr(nodes, "_default_store", None)
+    clear_retrieval_cache()
 
 
 @pytest.mark.asyncio
@@ -45,7 +82,7 @@ async def test_indexer_graph_basic_invoke():
         # Mock embeddings and vector store
         mock_embeddings.return_value = MagicMock()
         mock_store = AsyncMock()
-        mock_store.aadd_documents = AsyncMock()
+        mock_store.aadd_texts = AsyncMock(return_value=["test-id"])
         mock_vector_store.return_value = mock_store
 
         graph = build_indexer_graph()
@@ -55,6 +92,7 @@ async def test_indexer_graph_basic_invoke():
 
         assert result is not None
         assert "indexed_count" in result
+        mock_store.aadd_texts.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -68,7 +106,10 @@ async def test_retrieval_graph_basic_invoke():
 
         # Mock chat model
         mock_model = AsyncMock()
-        mock_model.ainvoke.return_value = MagicMock(content='{"datasource": "general"}')
+        mock_model.ainvoke.return_value = MagicMock(content="LangGraph is a framework.")
+        mock_model.with_structured_output = MagicMock(
+            return_value=AsyncMock(return_value=RoutingDecision(datasource="general"))
+        )
         mock_load_model.return_value = mock_model
 
         # Mock embeddings and vector store
@@ -87,6 +128,37 @@ async def test_retrieval_graph_basic_invoke():
         assert "messages" in result
 
 
+@pytest.mark.asyncio
+async def test_generate_response_streams_and_accumulates_answer():
+    """Test that streamed response tokens are forwarded and joined into the answer."""
+    answer = "LangGraph is a framework for agents."
+
+    def fake_model() -> GenericFakeChatModel:
+        return GenericFakeChatModel(messages=iter([AIMessage(content=answer)]))
+
+    routing = RunnableLambda(lambda _: RoutingDecision(datasource="general"))
+
+    with patch("rag_agent.utils.nodes.load_routing_model", return_value=routing):
+        graph = build_retrieval_graph()
+        input_state = AgentState(messages=[{"role": "human", "content": "What is LangGraph?"}])
+
+        with patch("rag_agent.utils.nodes.load_chat_model_from_env", return_value=fake_model()):
+            result = await graph.ainvoke(input_state)
+
+        with patch("rag_agent.utils.nodes.load_chat_model_from_env", return_value=fake_model()):
+            chunks = [
+                message
+                async for message, metadata in graph.astream(input_state, stream_mode="messages")
+                if metadata["langgraph_node"] == "generate_response"
+                and isinstance(message, AIMessageChunk)
+            ]
+
+    assert result["answer"] == answer
+    assert result["messages"][-1].content == answer
+    assert len(chunks) > 1
+    assert "".join(chunk.content for chunk in chunks) == answer
+
+
 @pytest.mark.asyncio
 async def test_researcher_graph_basic_invoke():
     """Test basic researcher graph invocation with mocked dependencies."""
@@ -117,3 +189,139 @@ async def test_researcher_graph_basic_invoke():
 
         assert result is not None
         assert "documents" in result
+
+
+def test_route_query_more_info_fans_out():
+    """Test that "more-info" queries dispatch planning and retrieval in parallel."""
+    state = AgentState(query_analysis="more-info")
+
+    sends = route_query(state)
+
+    assert sorted(send.node for send in sends) == ["research_planner", "retrieve_docs"]
+
+
+def test_add_documents_deduplicates():
+    """Test that the documents reducer drops repeated (source, content) pairs."""
+    doc = Document(page_content="LangGraph", metadata={"source": "a"})
+    other_source = Document(page_content="LangGraph", metadata={"source": "b"})
+
+    duplicate = Document(page_content="LangGraph", metadata={"source": "a"})
+
+    merged = add_documents([doc], [duplicate, other_source])
+
+    assert merged == [doc, other_source]
+
+
+def test_format_docs_xml_escapes_content():
+    """Test that document content and metadata are XML-escaped."""
+    doc = Document(page_content="a < b & c", metadata={"url": "https://x.io/?a=1&b=2"})
+
+    xml = format_docs_xml([doc])
+
+    assert "<content>a &lt; b &amp; c</content>" in xml
+    assert "<url>https://x.io/?a=1&amp;b=2</url>" in xml
+    assert xml.startswith("<documents>") and xml.endswith("</documents>")
+
+
+def test_add_documents_uses_precomputed_key():
+    """Test that documents tagged at retrieval time dedupe against untagged ones."""
+    untagged = Document(page_content="LangGraph", metadata={"source": "a"})
+    tagged = Document(
+        page_content="LangGraph",
+        metadata={"source": "a", "_id": "doc-1", DEDUPE_KEY_FIELD: content_digest("LangGraph")},
+    )
+
+    assert add_documents([untagged], [tagged]) == [untagged]
+
+    xml = format_docs_xml([tagged])
+    assert f"<{DEDUPE_KEY_FIELD}>" not in xml
+    assert "<_id>doc-1</_id>" in xml
+
+
+@pytest.mark.asyncio
+async def test_retrieve_documents_caches_results():
+    """Test that repeated queries are served from the retrieval cache."""
+    doc = Document(page_content="LangGraph", metadata={"source": "a"})
+    mock_store = AsyncMock()
+    mock_store.asimilarity_search = AsyncMock(return_value=[doc])
+
+    first = await retrieve_documents(mock_store, "What is LangGraph?", k=2)
+    second = await retrieve_documents(mock_store, "What is LangGraph?", k=2)
+
+    assert first == second
+    assert [d.page_content for d in first] == ["LangGraph"]
+    mock_store.asimilarity_search.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_retrieve_documents_tags_copies():
+    """Test that the dedupe key is added to copies, not to the store's own documents."""
+    doc = Document(page_content="LangGraph", metadata={"source": "a"})
+    mock_store = AsyncMock()
+    mock_store.asimilarity_search = AsyncMock(return_value=[doc])
+
+    [retrieved] = await retrieve_documents(mock_store, "What is LangGraph?")
+
+    assert retrieved.metadata[DEDUPE_KEY_FIELD] == content_digest("LangGraph")
+    assert retrieved.metadata["source"] == "a"
+    assert DEDUPE_KEY_FIELD not in doc.metadata
+
+
+@pytest.mark.asyncio
+async def test_retrieve_documents_waits_for_faiss_writes():
+    """Test that a FAISS search does not run while the index is being written to."""
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    store = _new_faiss_hnsw(DeterministicFakeEmbedding(size=16))
+    store.asimilarity_search = AsyncMock(return_value=[])
+
+    async with get_store_lock(store).write():
+        search = asyncio.create_task(retrieve_documents(store, "query"))
+        await asyncio.sleep(0.01)
+        store.asimilarity_search.assert_not_awaited()
+
+    await search
+    store.asimilarity_search.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_hosted_store_batches_are_not_serialized():
+    """Test that batches for non-FAISS stores are still added concurrently."""
+    active = 0
+    max_active = 0
+
+    async def fake_add_texts(texts, metadatas=None):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return [f"id-{text}" for text in texts]
+
+    mock_store = AsyncMock()
+    mock_store.aadd_texts = fake_add_texts
+    chunks = [Document(page_content=str(i)) for i in range(8)]
+
+    ids = await batch_embed_and_add(mock_store, chunks, batch_size=2, concurrency=4)
+
+    assert len(ids) == 8
+    assert max_active == 4
+
+
+@pytest.mark.asyncio
+async def test_faiss_index_add_persist_and_search(tmp_path):
+    """Test indexing, persisting and searching a real FAISS store."""
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    store = _new_faiss_hnsw(DeterministicFakeEmbedding(size=16))
+    chunks = [Document(page_content=f"chunk {i}", metadata={"source": "s"}) for i in range(5)]
+
+    ids, _ = await asyncio.gather(
+        batch_embed_and_add(store, chunks, batch_size=2),
+        retrieve_documents(store, "chunk 1", k=2),
+    )
+    await persist_vector_store(store, index_path=str(tmp_path))
+
+    assert len(ids) == 5
+    assert (tmp_path / "index.faiss").exists()
+    assert len(await retrieve_documents(store, "chunk 1", k=2)) == 2
@@ -7,7 +7,7 @@ from langgraph.graph import StateGraph
 from shared.logging import get_logger
 from .state import InputState, State
 from .utils.state import Context
-from .utils.nodes import call_model, route_model_output, tools_node
+from .utils.nodes import call_model, get_tools_node, route_model_output
 
 logger = get_logger(__name__)
 
@@ -21,7 +21,7 @@ def build_graph() -> Any:
 
     # Add nodes
     builder.add_node("call_model", call_model)
-    builder.add_node("tools", tools_node)
+    builder.add_node("tools", get_tools_node())
 
     # Set entry point
     builder.set_entry_point("call_model")
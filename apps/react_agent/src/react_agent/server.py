@@ -6,13 +6,15 @@ from typing import AsyncGenerator
 
 from fastapi import FastAPI
 from langgraph.server import add_routes
+from shared.http import aclose_http_client, prewarm_providers
 from shared.logging import setup_logging, get_logger
-from shared.settings import ReactAgentSettings
+from shared.settings import get_react_settings
 
 from .graph import build_graph
+from .utils.state import Context
 
 
-settings = ReactAgentSettings()
+settings = get_react_settings()
 
 # Set environment variables from settings so LangChain can find them
 if settings.openai_api_key:
@@ -29,9 +31,12 @@ logger = get_logger(__name__)
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan manager."""
     setup_logging(settings.log_level)
+    # Open provider connections before the first request needs them
+    await prewarm_providers([Context().model])
     logger.info("Starting React Agent server", port=settings.react_agent_port)
     yield
     logger.info("Shutting down React Agent server")
+    await aclose_http_client()
 
 
 app = FastAPI(
@@ -11,14 +11,14 @@ from langgraph.managed import IsLastStep
 from typing_extensions import Annotated
 
 
-@dataclass
+@dataclass(slots=True)
 class InputState:
     """Defines the input state for the agent, representing a narrower interface to the outside world."""
 
     messages: Annotated[Sequence[AnyMessage], add_messages] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class State(InputState):
     """Represents the complete state of the agent, extending InputState with additional attributes."""
 
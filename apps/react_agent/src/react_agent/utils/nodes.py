@@ -1,54 +1,158 @@
 """Node implementations for the React agent graph."""
 
+import asyncio
+import hashlib
+import time
 from datetime import UTC, datetime
-from typing import Any, Dict, List, Literal, cast
+from functools import cache
+from typing import Any, Dict, List, Literal, Sequence
+from uuid import uuid4
 
-from langchain_core.messages import AIMessage
-from langgraph.prebuilt import ToolNode
+import orjson
+from langchain_core.messages import AIMessage, AnyMessage
+from langgraph.runtime import Runtime
 
+from shared.cache import TTLCache
+from shared.http import http_client_cache, on_http_client_close, provider_http_kwargs
 from shared.logging import get_logger
 from ..state import State
 from .state import Context
-from .tools import TOOLS
+from .tools import TOOL_MAP, TOOLS
 
 # System prompt is defined in the Context class
 
 
 logger = get_logger(__name__)
 
+# Tool-bound chat models, keyed by the id of the (cached) model they were bound from
+_BOUND_MODEL_CACHE: Dict[int, Any] = {}
 
+# Model calls that exceed Context.request_timeout are retried this many times, waiting
+# MODEL_RETRY_BACKOFF * 2**attempt seconds before each retry
+MODEL_TIMEOUT_RETRIES = 1
+MODEL_RETRY_BACKOFF = 0.5
+
+# Recent model responses, keyed by a digest of the model, prompt, tools and messages.
+# The TTL matches the minute resolution of {system_time}, which the key leaves out.
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_TTL = 60.0
+_RESP_CACHE: TTLCache[bytes, AIMessage] = TTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+
+# Seconds {system_time} is rounded down to, and the last (time bucket, ISO timestamp)
+# pair rendered into the system prompt
+SYSTEM_TIME_BUCKET = 60
+_LAST_TS: tuple[int, str] = (0, "")
+
+
+@http_client_cache(maxsize=32)
 def load_chat_model(fully_specified_name: str) -> Any:
     """Load a chat model from a fully specified name.
 
+    Models are cached per name, so each one is constructed once per process.
+
     Args:
         fully_specified_name (str): String in the format 'provider/model'.
     """
     from langchain.chat_models import init_chat_model
 
     provider, model = fully_specified_name.split("/", maxsplit=1)
-    return init_chat_model(model, model_provider=provider)
 
+    return init_chat_model(model, model_provider=provider, **provider_http_kwargs(provider))
+
+
+# Bound models wrap cached chat models, so they go when those are rebuilt
+on_http_client_close(_BOUND_MODEL_CACHE.clear)
+
+
+def _load_bound_model(fully_specified_name: str) -> Any:
+    """Load a chat model with TOOLS bound, serializing the tool schemas only once."""
+    base_model = load_chat_model(fully_specified_name)
+
+    key = id(base_model)
+    if key not in _BOUND_MODEL_CACHE:
+        _BOUND_MODEL_CACHE[key] = base_model.bind_tools(TOOLS)
+
+    return _BOUND_MODEL_CACHE[key]
+
+
+def _iso_now_quantized() -> str:
+    """Return the current UTC time as ISO 8601, rounded down to ``SYSTEM_TIME_BUCKET``.
 
-async def call_model(state: State, context: Context | None = None) -> Dict[str, List[AIMessage]]:
+    Consecutive turns within a bucket get an identical system prompt, which keeps
+    provider-side prompt prefix caches warm; ``{system_time}`` therefore has
+    minute-level resolution.
+    """
+    global _LAST_TS
+
+    tick = int(time.time()) // SYSTEM_TIME_BUCKET
+    if tick != _LAST_TS[0]:
+        _LAST_TS = (tick, datetime.fromtimestamp(tick * SYSTEM_TIME_BUCKET, UTC).isoformat())
+    return _LAST_TS[1]
+
+
+def _response_cache_key(context: Context, messages: Sequence[AnyMessage]) -> bytes:
+    """Digest the inputs that determine a model response.
+
+    The unformatted system prompt is used, so the per-turn ``{system_time}`` value
+    does not defeat the cache.
+    """
+    payload = [
+        context.model,
+        context.system_prompt,
+        list(TOOL_MAP),
+        [
+            [
+                message.type,
+                message.content,
+                getattr(message, "tool_calls", None),
+                getattr(message, "tool_call_id", None),
+            ]
+            for message in messages
+        ],
+    ]
+    return hashlib.blake2b(orjson.dumps(payload, default=str), digest_size=16).digest()
+
+
+async def _ainvoke_with_timeout(model: Any, messages: List[Any], timeout: float) -> AIMessage:
+    """Invoke the model, retrying with backoff when a call exceeds ``timeout`` seconds."""
+    for attempt in range(MODEL_TIMEOUT_RETRIES + 1):
+        try:
+            return await asyncio.wait_for(model.ainvoke(messages), timeout=timeout)
+        except asyncio.TimeoutError:
+            if attempt == MODEL_TIMEOUT_RETRIES:
+                raise
+            delay = MODEL_RETRY_BACKOFF * 2**attempt
+            logger.warning("Model call timed out, retrying", attempt=attempt + 1, delay=delay)
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def call_model(state: State, runtime: Runtime[Context]) -> Dict[str, List[AIMessage]]:
     """Call the language model with the current state.
 
     This node represents the "Think" step in the ReAct pattern.
     """
-    if context is None:
-        context = Context()
+    context = runtime.context or Context()
+
+    model = _load_bound_model(context.model)
+
+    system_message = context.render_prompt(_iso_now_quantized())
 
-    model = load_chat_model(context.model).bind_tools(TOOLS)
+    messages = [{"role": "system", "content": system_message}, *state.messages]
 
-    system_message = context.system_prompt.format(system_time=datetime.now(tz=UTC).isoformat())
+    cache_key = _response_cache_key(context, state.messages) if context.enable_cache else None
+    cached = _RESP_CACHE.get(cache_key) if cache_key is not None else None
 
-    messages = [{"role": "system", "content": system_message}] + list(state.messages)
+    if cached is not None:
+        logger.info("Using cached model response", model=context.model)
+        response = cached.model_copy(update={"id": str(uuid4())})
+    else:
+        logger.info("Calling model", model=context.model, message_count=len(messages))
 
-    logger.info("Calling model", model=context.model, message_count=len(messages))
+        response = await _ainvoke_with_timeout(model, messages, context.request_timeout)
 
-    response = cast(
-        AIMessage,
-        await model.ainvoke(messages),
-    )
+        if cache_key is not None:
+            _RESP_CACHE.put(cache_key, response)
 
     # If we're at max iterations and model still wants to use tools, stop
     if state.is_last_step and response.tool_calls:
@@ -71,18 +175,30 @@ def route_model_output(state: State) -> Literal["__end__", "tools"]:
     This represents the decision point in the ReAct pattern.
     """
     last_message = state.messages[-1]
-    if not isinstance(last_message, AIMessage):
+    # Only call_model feeds this edge, so the type check is a debug-only sanity check
+    if __debug__ and not isinstance(last_message, AIMessage):
         raise ValueError(
             f"Expected AIMessage in output edges, but got {type(last_message).__name__}"
         )
 
-    if not last_message.tool_calls:
+    tool_calls = getattr(last_message, "tool_calls", None)
+    if not tool_calls:
         logger.info("Model completed without tool calls - ending")
         return "__end__"
 
-    logger.info("Model requested tool calls", tool_count=len(last_message.tool_calls))
+    logger.info("Model requested tool calls", tool_count=len(tool_calls))
     return "tools"
 
 
-# Create the tool node for the "Act" step in ReAct
-tools_node = ToolNode(TOOLS)
+@cache
+def get_tools_node() -> Any:
+    """Create the tool node for the "Act" step in ReAct.
+
+    When the model requests several tools in one message, ToolNode runs the calls
+    concurrently with asyncio.gather and turns a failing call into an error
+    ToolMessage without cancelling its siblings. langgraph.prebuilt is imported
+    on first use so importing this module stays cheap.
+    """
+    from langgraph.prebuilt import ToolNode
+
+    return ToolNode(TOOLS)
@@ -2,14 +2,15 @@
 
 import os
 from dataclasses import dataclass, field, fields
-from typing import Annotated
+from functools import lru_cache
+from typing import Annotated, Any
 
 from shared.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class Context:
     """The context configuration for the React agent."""
 
@@ -17,7 +18,8 @@ class Context:
         default="You are a helpful AI assistant.\n\nSystem time: {system_time}",
         metadata={
             "description": "The system prompt to use for the agent's interactions. "
-            "This prompt sets the context and behavior for the agent."
+            "This prompt sets the context and behavior for the agent. "
+            "{system_time} is filled in with the current UTC time at minute resolution."
         },
     )
 
@@ -41,13 +43,64 @@ class Context:
         metadata={"description": "Maximum number of reasoning iterations before stopping."},
     )
 
+    request_timeout: float = field(
+        default=30.0,
+        metadata={"description": "Seconds to wait for each model call before retrying it once."},
+    )
+
+    enable_cache: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether to reuse cached model responses for identical "
+            "prompts, messages and tools within this process."
+        },
+    )
+
     def __post_init__(self) -> None:
-        """Fetch env vars for attributes that were not passed as args."""
-        for f in fields(self):
-            if not f.init:
-                continue
-
-            if getattr(self, f.name) == f.default:
-                env_value = os.environ.get(f.name.upper(), f.default)
-                setattr(self, f.name, env_value)
-                logger.debug("Loaded config from environment", field=f.name, value=env_value)
+        """Apply env var overrides for attributes that were not passed as args.
+
+        The environment is read once at import time (see ``_CTX_FIELDS``), so
+        changing it afterwards requires a process restart.
+        """
+        for name, default, env_value in _CTX_FIELDS:
+            if getattr(self, name) == default:
+                object.__setattr__(self, name, env_value)
+
+    def render_prompt(self, system_time: str) -> str:
+        """Render the system prompt for the given time, reusing earlier renderings."""
+        return _render_prompt(self.system_prompt, system_time)
+
+
+@lru_cache(maxsize=32)
+def _render_prompt(template: str, system_time: str) -> str:
+    """Fill ``{system_time}`` into a system prompt template."""
+    return template.format_map({"system_time": system_time})
+
+
+def _coerce_env_value(raw: str, default: Any) -> Any:
+    """Convert an env var string to the type of the field's default."""
+    if isinstance(default, bool):
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(raw)
+    if isinstance(default, float):
+        return float(raw)
+    return raw
+
+
+def _load_env_overrides() -> tuple[tuple[str, Any, Any], ...]:
+    """Collect (name, default, env value) for each Context field set in the environment."""
+    overrides: list[tuple[str, Any, Any]] = []
+    for f in fields(Context):
+        if not f.init:
+            continue
+
+        raw = os.environ.get(f.name.upper())
+        if raw is not None:
+            overrides.append((f.name, f.default, _coerce_env_value(raw, f.default)))
+            logger.debug("Loaded config from environment", field=f.name, value=raw)
+    return tuple(overrides)
+
+
+# Context fields overridden by env vars, resolved once per process
+_CTX_FIELDS = _load_env_overrides()
@@ -5,16 +5,75 @@ These tools are intended as examples to get started. For production use,
 consider implementing more robust and specialized tools tailored to your needs.
 """
 
-from typing import Any, Callable, List, Optional, cast
-
-from langchain_tavily import TavilySearch
+import asyncio
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, cast
 
+from shared.cache import TTLCache
 from shared.logging import get_logger
 
+if TYPE_CHECKING:
+    from langchain_tavily import TavilySearch
+
 # Context imported when needed
 
 logger = get_logger(__name__)
 
+# Recent successful search results, keyed by (max results, query)
+SEARCH_CACHE_SIZE = 512
+SEARCH_CACHE_TTL = 60.0
+_SEARCH_CACHE: TTLCache[Tuple[int, str], dict[str, Any]] = TTLCache(
+    SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL
+)
+
+# Searches currently running, so concurrent duplicate queries share one Tavily call
+_INFLIGHT: "Dict[Tuple[int, str], asyncio.Task[Optional[dict[str, Any]]]]" = {}
+
+
+@lru_cache(maxsize=8)
+def _load_tavily_search(max_results: int) -> "TavilySearch":
+    """Load a Tavily search tool, reusing one instance per result limit.
+
+    langchain_tavily is imported on first use to keep it off the import path.
+    """
+    from langchain_tavily import TavilySearch
+
+    return TavilySearch(max_results=max_results)
+
+
+def clear_search_cache() -> None:
+    """Drop all cached search results."""
+    _SEARCH_CACHE.clear()
+
+
+async def _run_search(query: str, max_results: int) -> Optional[dict[str, Any]]:
+    """Run a single Tavily search, returning None if it fails."""
+    try:
+        wrapped = _load_tavily_search(max_results)
+        result = await wrapped.ainvoke({"query": query})
+        logger.info("Search completed", query=query, results_count=len(result.get("results", [])))
+        return cast(dict[str, Any], result)
+    except Exception as e:
+        logger.error("Search failed", query=query, error=str(e))
+        return None
+
+
+async def _search_and_cache(
+    key: Tuple[int, str], query: str, max_results: int
+) -> Optional[dict[str, Any]]:
+    """Run a search and cache its result if it succeeded."""
+    result = await _run_search(query, max_results)
+    # Failures are not cached, so the next call retries
+    if result is not None:
+        _SEARCH_CACHE.put(key, result)
+    return result
+
+
+def _forget_inflight(key: Tuple[int, str], task: "asyncio.Task[Any]") -> None:
+    """Drop a finished search from the in-flight map, unless it was already replaced."""
+    if _INFLIGHT.get(key) is task:
+        del _INFLIGHT[key]
+
 
 async def search(query: str) -> Optional[dict[str, Any]]:
     """Search for general web results.
@@ -23,22 +82,32 @@ async def search(query: str) -> Optional[dict[str, Any]]:
     to provide comprehensive, accurate, and trusted results. It's particularly useful
     for answering questions about current events.
 
+    Successful results are cached for ``SEARCH_CACHE_TTL`` seconds, and concurrent
+    calls with the same query wait on the search already in flight.
+
     Args:
         query: The search query string
 
     Returns:
         Search results from Tavily, or None if search fails
     """
-    try:
-        # TODO: Get max_search_results from context when available
-        max_results = 10
-        wrapped = TavilySearch(max_results=max_results)
-        result = await wrapped.ainvoke({"query": query})
-        logger.info("Search completed", query=query, results_count=len(result.get("results", [])))
-        return cast(dict[str, Any], result)
-    except Exception as e:
-        logger.error("Search failed", query=query, error=str(e))
-        return None
+    # TODO: Get max_search_results from context when available
+    max_results = 10
+    key = (max_results, query)
+
+    cached = _SEARCH_CACHE.get(key)
+    if cached is not None:
+        logger.info("Search served from cache", query=query)
+        return cached
+
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.create_task(_search_and_cache(key, query, max_results))
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda done: _forget_inflight(key, done))
+
+    # Shielded so a cancelled caller does not cancel the search other callers await
+    return await asyncio.shield(task)
 
 
 # Example of additional tools you might want to implement
@@ -72,3 +141,6 @@ async def code_executor(code: str, language: str = "python") -> Optional[str]:
 
 
 TOOLS: List[Callable[..., Any]] = [search]
+
+# Tools by name, for O(1) dispatch of model tool calls
+TOOL_MAP: Dict[str, Callable[..., Any]] = {fn.__name__: fn for fn in TOOLS}
@@ -1,62 +1,221 @@
 """Smoke tests for the React agent graph."""
 
+import asyncio
+
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from langchain_core.messages import AIMessage
 
 from react_agent.graph import build_graph
 from react_agent.state import InputState
+from react_agent.utils import nodes, tools
+from react_agent.utils.state import Context
+from shared.http import aclose_http_client, get_http_client
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Drop cached model and search responses so each test sees its own mocks."""
+    nodes._RESP_CACHE.clear()
+    nodes._BOUND_MODEL_CACHE.clear()
+    tools.clear_search_cache()
+
+
+@pytest.fixture(scope="session")
+def graph():
+    """Build the graph once; the model is looked up per call, so tests can share it."""
+    return build_graph()
+
+
+@pytest.fixture
+def mock_model(monkeypatch):
+    """Patch load_chat_model to return a mock chat model bound to itself."""
+    model = AsyncMock()
+    model.bind_tools = MagicMock(return_value=model)
+    monkeypatch.setattr(nodes, "load_chat_model", MagicMock(return_value=model))
+    return model
 
 
 @pytest.mark.asyncio
-async def test_graph_builds():
+async def test_graph_builds(graph):
     """Test that the graph builds without errors."""
-    graph = build_graph()
     assert graph is not None
 
 
 @pytest.mark.asyncio
-async def test_graph_basic_invoke():
-    """Test basic graph invocation with mocked dependencies."""
-    with patch("react_agent.utils.nodes.load_chat_model") as mock_load_model:
-        # Mock the chat model
-        mock_model = AsyncMock()
-        mock_model.bind_tools.return_value = mock_model
-        mock_model.ainvoke.return_value = type(
-            "AIMessage",
-            (),
-            {"content": "Hello! How can I help you today?", "tool_calls": [], "id": "test-id"},
-        )()
-        mock_load_model.return_value = mock_model
+@pytest.mark.parametrize(
+    "context",
+    [
+        None,
+        Context(model="anthropic/claude-3-5-sonnet-20240620", max_search_results=5),
+        Context(enable_cache=False),
+    ],
+    ids=["default", "custom-model", "no-cache"],
+)
+async def test_graph_invoke(graph, mock_model, context):
+    """Test graph invocation with mocked dependencies and various contexts."""
+    mock_model.ainvoke.return_value = AIMessage(
+        content="Hello! How can I help you today?", id="test-id"
+    )
+
+    input_state = InputState(messages=[{"role": "human", "content": "Hello, who are you?"}])
+
+    result = await graph.ainvoke(input_state, context=context)
+    assert result is not None
+    assert result["messages"][-1].content == "Hello! How can I help you today?"
+
+
+@pytest.mark.asyncio
+async def test_graph_reuses_cached_response(graph, mock_model):
+    """Test that an identical turn is answered from the response cache."""
+    mock_model.ainvoke.return_value = AIMessage(content="Cached response", id="test-id")
 
-        graph = build_graph()
+    input_state = InputState(messages=[{"role": "human", "content": "Same question"}])
 
-        # Test basic invocation
-        input_state = InputState(messages=[{"role": "human", "content": "Hello, who are you?"}])
+    first = await graph.ainvoke(input_state)
+    second = await graph.ainvoke(input_state)
 
+    assert first["messages"][-1].content == second["messages"][-1].content
+    assert first["messages"][-1].id != second["messages"][-1].id
+    mock_model.ainvoke.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_graph_skips_expired_cached_response(graph, mock_model, monkeypatch):
+    """Test that cached responses older than the TTL are not replayed."""
+    mock_model.ainvoke.return_value = AIMessage(content="Fresh response", id="test-id")
+    monkeypatch.setattr(nodes._RESP_CACHE, "ttl", 0)
+
+    input_state = InputState(messages=[{"role": "human", "content": "Same question"}])
+
+    await graph.ainvoke(input_state)
+    await graph.ainvoke(input_state)
+
+    assert mock_model.ainvoke.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_graph_runs_tool_calls_concurrently(graph, mock_model):
+    """Test that multiple tool calls in one model turn are executed in parallel."""
+    active = 0
+    max_active = 0
+
+    async def fake_search(_: dict) -> dict:
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return {"results": []}
+
+    mock_search = MagicMock()
+    mock_search.ainvoke = fake_search
+
+    mock_model.ainvoke.side_effect = [
+        AIMessage(
+            content="",
+            id="tool-turn",
+            tool_calls=[
+                {"name": "search", "args": {"query": "first"}, "id": "call-1"},
+                {"name": "search", "args": {"query": "second"}, "id": "call-2"},
+            ],
+        ),
+        AIMessage(content="Done", id="final-turn"),
+    ]
+
+    input_state = InputState(messages=[{"role": "human", "content": "Search twice"}])
+
+    with patch("react_agent.utils.tools._load_tavily_search", return_value=mock_search):
         result = await graph.ainvoke(input_state)
-        assert result is not None
-        assert "messages" in result
+
+    assert result["messages"][-1].content == "Done"
+    assert max_active == 2
 
 
 @pytest.mark.asyncio
-async def test_graph_with_context():
-    """Test graph invocation with custom context."""
-    with patch("react_agent.utils.nodes.load_chat_model") as mock_load_model:
-        mock_model = AsyncMock()
-        mock_model.bind_tools.return_value = mock_model
-        mock_model.ainvoke.return_value = type(
-            "AIMessage", (), {"content": "Test response", "tool_calls": [], "id": "test-id"}
-        )()
-        mock_load_model.return_value = mock_model
+async def test_search_coalesces_duplicate_queries():
+    """Test that concurrent identical searches share a single Tavily call."""
+    calls = 0
 
-        graph = build_graph()
+    async def fake_search(_: dict) -> dict:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"results": [{"url": "https://example.com"}]}
 
-        # Test with custom context
-        from react_agent.utils.state import Context
+    mock_search = MagicMock()
+    mock_search.ainvoke = fake_search
 
-        context = Context(model="anthropic/claude-3-5-sonnet-20240620", max_search_results=5)
+    with patch("react_agent.utils.tools._load_tavily_search", return_value=mock_search):
+        first, second = await asyncio.gather(tools.search("same"), tools.search("same"))
+        third = await tools.search("same")
+
+    assert first == second == third
+    assert calls == 1
+    assert not tools._INFLIGHT
+
+
+@pytest.mark.asyncio
+async def test_search_survives_cancelled_first_caller():
+    """Test that cancelling the caller that started a search does not fail the others."""
+    release = asyncio.Event()
+
+    async def fake_search(_: dict) -> dict:
+        await release.wait()
+        return {"results": [{"url": "https://example.com"}]}
+
+    mock_search = MagicMock()
+    mock_search.ainvoke = fake_search
+
+    with patch("react_agent.utils.tools._load_tavily_search", return_value=mock_search):
+        owner = asyncio.create_task(tools.search("same"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(tools.search("same"))
+        await asyncio.sleep(0)
+
+        owner.cancel()
+        release.set()
+
+        assert (await waiter) == {"results": [{"url": "https://example.com"}]}
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+
+    await asyncio.sleep(0)
+    assert not tools._INFLIGHT
+
+
+@pytest.mark.asyncio
+async def test_graph_retries_timed_out_model_call(graph, mock_model, monkeypatch):
+    """Test that a model call exceeding the request timeout is retried once."""
+    calls = 0
+
+    async def slow_then_fast(_):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(1)
+        return AIMessage(content="Recovered", id="retry-id")
+
+    mock_model.ainvoke.side_effect = slow_then_fast
+    monkeypatch.setattr(nodes, "MODEL_RETRY_BACKOFF", 0)
+
+    input_state = InputState(messages=[{"role": "human", "content": "Hello"}])
+
+    result = await graph.ainvoke(input_state, context=Context(request_timeout=0.05))
+
+    assert result["messages"][-1].content == "Recovered"
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_closing_http_client_drops_cached_models():
+    """Test that models built on the shared HTTP client are rebuilt after it closes."""
+    with patch("langchain.chat_models.init_chat_model", side_effect=lambda *a, **k: object()):
+        before = nodes.load_chat_model("openai/gpt-4o")
+        closed_client = get_http_client()
 
-        input_state = InputState(messages=[{"role": "human", "content": "Test message"}])
+        await aclose_http_client()
 
-        result = await graph.ainvoke(input_state, context=context)
-        assert result is not None
+        assert closed_client.is_closed
+        assert nodes.load_chat_model("openai/gpt-4o") is not before
@@ -0,0 +1,125 @@
+"""Shared HTTP client for outbound LLM and embeddings calls."""
+
+import asyncio
+from functools import lru_cache
+from typing import Any, Callable, TypeVar
+
+import httpx
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+_client: httpx.AsyncClient | None = None
+
+# Called after the shared client is closed, so caches of SDK clients built on it are reset
+_close_callbacks: list[Callable[[], None]] = []
+
+# Prewarm is only an optimisation, so an unreachable provider must not hold up startup
+PREWARM_TIMEOUT = httpx.Timeout(5.0, connect=2.0)
+
+# Base URLs of providers whose SDK clients are built on the shared HTTP client
+PROVIDER_BASE_URLS: dict[str, str] = {
+    "openai": "https://api.openai.com",
+}
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def provider_http_kwargs(provider: str) -> dict[str, Any]:
+    """Return the kwargs that put a provider's SDK client on the shared HTTP client.
+
+    Only providers listed in ``PROVIDER_BASE_URLS`` accept an external httpx client;
+    for any other provider this is empty and the SDK keeps its own.
+    """
+    if provider in PROVIDER_BASE_URLS:
+        return {"http_async_client": get_http_client()}
+    return {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the process-wide async HTTP client, creating it on first use.
+
+    Sharing one client lets every provider integration reuse pooled keep-alive
+    connections and HTTP/2 multiplexing instead of opening its own pool.
+    """
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=50,
+                max_connections=100,
+                keepalive_expiry=30.0,
+            ),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        )
+
+    return _client
+
+
+def on_http_client_close(callback: Callable[[], None]) -> Callable[[], None]:
+    """Register ``callback`` to run whenever the shared HTTP client is closed.
+
+    Modules that cache SDK clients built on ``get_http_client()`` use this to drop
+    them, so a later lifespan in the same process rebuilds them on a fresh client.
+    Returns the callback, so it can be used as a decorator.
+    """
+    _close_callbacks.append(callback)
+    return callback
+
+
+def http_client_cache(maxsize: int) -> Callable[[F], F]:
+    """``lru_cache`` for loaders of SDK clients that may use the shared HTTP client.
+
+    The cache is cleared when the shared client is closed, so the next lifespan in the
+    same process builds fresh clients instead of reusing ones bound to a closed pool.
+    """
+
+    def decorator(fn: F) -> F:
+        cached = lru_cache(maxsize=maxsize)(fn)
+        on_http_client_close(cached.cache_clear)
+        return cached  # type: ignore[return-value]
+
+    return decorator
+
+
+async def aclose_http_client() -> None:
+    """Close the shared HTTP client, if it was created, and reset dependent caches."""
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+        for callback in _close_callbacks:
+            callback()
+
+
+async def prewarm_providers(models: list[str]) -> None:
+    """Open pooled connections to the providers of the given models.
+
+    Issues a cheap ``HEAD`` request per provider so the TCP and TLS handshakes happen
+    at startup rather than on the first user request. Each request is bounded by
+    ``PREWARM_TIMEOUT``; failures are logged and ignored.
+
+    Args:
+        models: Fully specified model names in the format 'provider/model'.
+    """
+    providers = {model.split("/", maxsplit=1)[0] for model in models}
+    urls = [PROVIDER_BASE_URLS[p] for p in sorted(providers) if p in PROVIDER_BASE_URLS]
+    if not urls:
+        return
+
+    client = get_http_client()
+    results = await asyncio.gather(
+        *(client.head(url, timeout=PREWARM_TIMEOUT) for url in urls), return_exceptions=True
+    )
+
+    for url, result in zip(urls, results):
+        if isinstance(result, BaseException):
+            logger.warning("Provider prewarm failed", url=url, error=str(result))
+        else:
+            logger.info("Provider connection prewarmed", url=url)
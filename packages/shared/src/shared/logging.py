@@ -1,46 +1,72 @@
 """Structured logging configuration using structlog."""
 
+import json
 import logging
 import sys
 from typing import Any
 
+import orjson
 import structlog
 from structlog.types import Processor
 
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+def _orjson_dumps(obj: Any, **kwargs: Any) -> str:
+    """Serialize a log event with orjson, honouring structlog's ``default`` fallback.
+
+    Falls back to the stdlib encoder for values orjson rejects (e.g. integers wider
+    than 64 bits), so a log call never raises.
+    """
+    default = kwargs.get("default")
+    try:
+        return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS).decode()
+    except TypeError:
+        return json.dumps(obj, default=default)
+
 
 def setup_logging(log_level: str = "INFO") -> None:
     """Configure structured logging for the application."""
 
+    int_level = getattr(logging, log_level.upper())
+
     # Configure standard library logging
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
-        level=getattr(logging, log_level.upper()),
+        level=int_level,
     )
 
     # Configure structlog processors
     processors: list[Processor] = [
         structlog.contextvars.merge_contextvars,
-        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.TimeStamper(fmt="iso", utc=True),
         structlog.processors.add_log_level,
-        structlog.processors.CallsiteParameterAdder(
-            parameters=[
-                structlog.processors.CallsiteParameter.FILENAME,
-                structlog.processors.CallsiteParameter.FUNC_NAME,
-                structlog.processors.CallsiteParameter.LINENO,
-            ]
-        ),
     ]
 
     # Add development-friendly formatting in development
     if log_level.upper() == "DEBUG":
+        # Callsite lookup inspects the stack on every event, so only pay for it when debugging
+        processors.append(
+            structlog.processors.CallsiteParameterAdder(
+                parameters=[
+                    structlog.processors.CallsiteParameter.FILENAME,
+                    structlog.processors.CallsiteParameter.FUNC_NAME,
+                    structlog.processors.CallsiteParameter.LINENO,
+                ]
+            )
+        )
         processors.append(structlog.dev.ConsoleRenderer())
     else:
-        processors.append(structlog.processors.JSONRenderer())
+        # The filtering bound logger does not pass exc_info on to the stdlib handler, so
+        # render tracebacks into the event before serializing it
+        processors.append(structlog.processors.format_exc_info)
+        processors.append(structlog.processors.JSONRenderer(serializer=_orjson_dumps))
 
     structlog.configure(
         processors=processors,
-        wrapper_class=structlog.stdlib.BoundLogger,
+        # Calls below the configured level return immediately, before any processor runs
+        wrapper_class=structlog.make_filtering_bound_logger(int_level),
         logger_factory=structlog.stdlib.LoggerFactory(),
         cache_logger_on_first_use=True,
     )
@@ -1,5 +1,6 @@
 """Shared settings configuration using Pydantic."""
 
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import Literal
 
@@ -40,3 +41,21 @@ class RagAgentSettings(BaseAppSettings):
     # Vector store configuration
     qdrant_url: str | None = None
     qdrant_api_key: str | None = None
+
+
+@lru_cache(maxsize=1)
+def get_react_settings() -> ReactAgentSettings:
+    """Get the React agent settings, parsed once per process.
+
+    Changes to the environment or ``.env`` require a process restart.
+    """
+    return ReactAgentSettings()
+
+
+@lru_cache(maxsize=1)
+def get_rag_settings() -> RagAgentSettings:
+    """Get the RAG agent settings, parsed once per process.
+
+    Changes to the environment or ``.env`` require a process restart.
+    """
+    return RagAgentSettings()
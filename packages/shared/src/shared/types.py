@@ -1,7 +1,7 @@
 """Common type definitions for LangGraph agents."""
 
 from typing import TypedDict, List, Dict, Any, Literal
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 # Message types compatible with LangChain
@@ -45,6 +45,8 @@ class FunctionMessage(TypedDict):
 class ToolCall(BaseModel):
     """Tool call information."""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     id: str
     name: str
     args: Dict[str, Any]
@@ -53,6 +55,8 @@ class ToolCall(BaseModel):
 class ToolResult(BaseModel):
     """Tool execution result."""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     tool_call_id: str
     content: str
     is_error: bool = False